@@ -17,31 +17,87 @@
 import asyncio
 import logging
 import os
-from uuid import uuid4
+import queue
+import sys
+from logging.handlers import QueueHandler
+from logging.handlers import QueueListener
 from inorbit_edge_executor.behavior_tree import (
     DefaultTreeBuilder,
     BehaviorTree,
     NodeFromStepBuilder,
     BehaviorTreeBuilderContext,
-    register_accepted_node_types,
+    bt_node,
 )
 from inorbit_edge_executor.datatypes import (
     MissionDefinition,
     MissionRuntimeOptions,
-    MissionStepSetData,
     MissionStepPoseWaypoint,
-    MissionStepIf,
     Pose,
 )
 from inorbit_edge_executor.worker_pool import WorkerPool
-from inorbit_edge_executor.dummy_backend import DummyDB
+from inorbit_edge_executor.db import get_db
+from inorbit_edge_executor.ids import next_id
 from inorbit_edge_executor.inorbit import InOrbitAPI
 from inorbit_edge_executor.mission import Mission
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+class UnformattedQueueHandler(QueueHandler):
+    """
+    QueueHandler that enqueues records as they are. The default one formats each record before
+    enqueueing it (so it can be sent to another process), in the thread that logs it: here, the
+    event loop. Records are not sent to other processes in this example.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_logging() -> QueueListener:
+    """
+    Logs through a queue: the event loop only enqueues records, while a QueueListener thread
+    formats them and writes them to stderr, so many nodes logging concurrently don't block on
+    console output. The returned listener must be stopped on exit to flush pending records.
+    """
+    log_queue = queue.SimpleQueue()
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+    logging.basicConfig(level=logging.INFO, handlers=[UnformattedQueueHandler(log_queue)])
+    listener = QueueListener(log_queue, handler)
+    listener.start()
+    return listener
+
+
+class WaypointReachedNotifier:
+    """
+    Dispatches "waypoint reached" notifications to the nodes waiting for them. A connector would
+    call notify() from the callback that receives robot status updates (e.g. from the fleet
+    manager), so nodes sleep until the robot arrives instead of polling its pose.
+    """
+
+    def __init__(self):
+        self._callbacks = {}
+
+    def subscribe(self, robot_id: str, waypoint_id: str, callback):
+        self._callbacks[(robot_id, waypoint_id)] = callback
+
+    def unsubscribe(self, robot_id: str, waypoint_id: str):
+        self._callbacks.pop((robot_id, waypoint_id), None)
+
+    def notify(self, robot_id: str, waypoint_id: str):
+        callback = self._callbacks.pop((robot_id, waypoint_id), None)
+        if callback:
+            callback()
+
+
+waypoint_notifier = WaypointReachedNotifier()
+
+
+# @bt_node generates the methods to (de)serialize the node from its __init__ arguments (the
+# waypoint is persisted as a dict and restored as a Pose), and registers the node type so it can
+# be deserialized when needed
+@bt_node
 class MyWaypointNode(BehaviorTree):
     """
     Node to make the robot go to a waypoint. It should wait for the robot to reach the waypoint
@@ -52,26 +108,23 @@ class MyWaypointNode(BehaviorTree):
         super().__init__(*args, **kwargs)
         self.waypoint = waypoint
         self.robot_id = context.robot_api.robot_id
+        self._arrived = asyncio.Event()
 
     async def _execute(self):
-        print(f"Sending robot {self.robot_id} to waypoint {self.waypoint}")
-        print(f"Waiting for robot {self.robot_id} to reach waypoint {self.waypoint}")
-        await asyncio.sleep(1)
-        print(f"Robot {self.robot_id} reached waypoint {self.waypoint}")
-
-    def dump_object(self):
-        object = super().dump_object()
-        object["waypoint"] = self.waypoint.copy()
-        return object
-
-    @classmethod
-    def from_object(cls, context, waypoint, **kwargs):
-        node = MyWaypointNode(context, waypoint, **kwargs)
-        return node
-
-
-# Register the new node type so it can be deserialized when needed
-register_accepted_node_types([MyWaypointNode])
+        self._arrived.clear()
+        waypoint_notifier.subscribe(self.robot_id, self.waypoint.waypointId, self._arrived.set)
+        try:
+            logger.info("Sending robot %s to waypoint %s", self.robot_id, self.waypoint)
+            # Simulate the robot reporting its arrival one second later. A real robot would
+            # send its status through the connector, which calls waypoint_notifier.notify()
+            asyncio.get_running_loop().call_later(
+                1, waypoint_notifier.notify, self.robot_id, self.waypoint.waypointId
+            )
+            logger.info("Waiting for robot %s to reach waypoint %s", self.robot_id, self.waypoint)
+            await self._arrived.wait()
+        finally:
+            waypoint_notifier.unsubscribe(self.robot_id, self.waypoint.waypointId)
+        logger.info("Robot %s reached waypoint %s", self.robot_id, self.waypoint)
 
 
 class MyNodeFromStepBuilder(NodeFromStepBuilder):
@@ -94,7 +147,7 @@ class MyTreeBuilder(DefaultTreeBuilder):
 async def main():
     """Run the mission executor"""
     # A database can be used to serialize workers, so they can be resumed on restarts
-    db = DummyDB()
+    db = await get_db(f"sqlite:{os.getenv('DB_PATH', 'missions.db')}")
     # InOrbit API is used for various purpose, including: mission tracking,
     # evaluating expressions, dispatching actions and more
     INORBIT_API_KEY = os.getenv("INORBIT_API_KEY")
@@ -103,113 +156,142 @@ async def main():
 
     INORBIT_API_URL = os.getenv("INORBIT_API_URL", "https://api.inorbit.ai")
 
+    # One or more robot ids, separated by commas. A mission is executed on each robot.
     ROBOT_ID = os.getenv("ROBOT_ID")
     if ROBOT_ID is None:
         raise ValueError("ROBOT_ID environment variable is not set")
+    robot_ids = [robot_id.strip() for robot_id in ROBOT_ID.split(",") if robot_id.strip()]
 
-    inorbit_api = InOrbitAPI(base_url=INORBIT_API_URL, api_key=INORBIT_API_KEY)
-    worker_pool = WorkerPool(db=db, api=inorbit_api, behavior_tree_builder=MyTreeBuilder())
-    # Mission should be already created in InOrbit during the dispatching. Here we mock that by
-    # manually creating it using the mission tracking API.
-    # This is not needed in real scenarios, as the mission is already created in InOrbit.
-    mission_id = uuid4().hex
-    logger.info(f"Creating mission {mission_id}")
-    await inorbit_api.post(
-        path="/missions",
-        body={
-            "missionId": mission_id,
-            "robotId": ROBOT_ID,
-            "state": "starting",
-            "label": "Example inorbit_edge_executor mission",
-            "tasks": [
-                {"taskId": "step 0", "label": "Step 0"},
-                {"taskId": "step 1", "label": "Step 1"},
-                {"taskId": "step 2", "label": "Step 2"},
-                {"taskId": "step 3", "label": "Then waypoint A"},
-                {"taskId": "step 4", "label": "Else waypoint B"},
-            ],
-        },
+    # Optionally coalesce the requests creating the missions (see post_batched())
+    batch_window_ms = os.getenv("INORBIT_API_BATCH_WINDOW_MS")
+    inorbit_api = InOrbitAPI(
+        base_url=INORBIT_API_URL,
+        api_key=INORBIT_API_KEY,
+        batch_window_ms=float(batch_window_ms) if batch_window_ms else None,
     )
+    worker_pool = WorkerPool(db=db, api=inorbit_api, behavior_tree_builder=MyTreeBuilder())
     # Launch the worker pool to start processing missions
     await worker_pool.start()
-    # Execute a mission
-    mission = Mission(
-        id=mission_id,
-        robot_id=ROBOT_ID,
-        definition=MissionDefinition(
-            label="A mission definition",
-            steps=[
-                MissionStepSetData.model_validate(
-                    {
-                        "label": "set some data",
-                        "completeTask": "step 0",
-                        "data": {"key": "value"},
-                    }
-                ),
-                MissionStepSetData.model_validate(
-                    {
-                        "label": "set more data",
-                        "completeTask": "step 1",
-                        "data": {"key2": "value2"},
-                    }
-                ),
-                MissionStepPoseWaypoint.model_validate(
-                    {
-                        "label": "go to waypoint",
-                        "completeTask": "step 2",
-                        "waypoint": {
-                            "x": 0,
-                            "y": 0,
-                            "theta": 0,
-                            "frameId": "map",
-                            "waypointId": "wp1",
+    # Mission definition, as received from InOrbit's dispatcher
+    definition = {
+        "label": "A mission definition",
+        "steps": [
+            {
+                "label": "set some data",
+                "completeTask": "step 0",
+                "data": {"key": "value"},
+            },
+            {
+                "label": "set more data",
+                "completeTask": "step 1",
+                "data": {"key2": "value2"},
+            },
+            {
+                "label": "go to waypoint",
+                "completeTask": "step 2",
+                "waypoint": {
+                    "x": 0,
+                    "y": 0,
+                    "theta": 0,
+                    "frameId": "map",
+                    "waypointId": "wp1",
+                },
+            },
+            {
+                "label": "if",
+                "if": {
+                    "expression": "0 > 1",
+                    "then": [
+                        {
+                            "label": "go to waypoint A",
+                            "completeTask": "step 3",
+                            "waypoint": {
+                                "x": 0,
+                                "y": 0,
+                                "theta": 0,
+                                "frameId": "map",
+                                "waypointId": "wpA",
+                            },
                         },
-                    }
-                ),
-                MissionStepIf.model_validate(
-                    {
-                        "label": "if",
-                        "if": {
-                            "expression": "0 > 1",
-                            "then": [
-                                {
-                                    "label": "go to waypoint A",
-                                    "completeTask": "step 3",
-                                    "waypoint": {
-                                        "x": 0,
-                                        "y": 0,
-                                        "theta": 0,
-                                        "frameId": "map",
-                                        "waypointId": "wpA",
-                                    },
-                                },
-                            ],
-                            "else": [
-                                {
-                                    "label": "go to waypoint B",
-                                    "completeTask": "step 4",
-                                    "waypoint": {
-                                        "x": 0,
-                                        "y": 0,
-                                        "theta": 0,
-                                        "frameId": "map",
-                                        "waypointId": "wpB",
-                                    },
-                                },
-                            ],
+                    ],
+                    "else": [
+                        {
+                            "label": "go to waypoint B",
+                            "completeTask": "step 4",
+                            "waypoint": {
+                                "x": 0,
+                                "y": 0,
+                                "theta": 0,
+                                "frameId": "map",
+                                "waypointId": "wpB",
+                            },
                         },
-                    }
-                ),
-            ],
-        ),
-        arguments={"arg1": "value1"},
-    )
+                    ],
+                },
+            },
+        ],
+    }
+    # Execute a mission on each robot
+    missions = [
+        Mission(
+            id=next_id(),
+            robot_id=robot_id,
+            # Each mission gets its own definition (WorkerPool.translate_mission() changes it).
+            # Steps are validated once and reused for identical steps in later submissions.
+            definition=MissionDefinition.from_cached_dict(definition),
+            arguments={"arg1": "value1"},
+        )
+        for robot_id in robot_ids
+    ]
     options = MissionRuntimeOptions()
-    await worker_pool.submit_work(mission=mission, options=options)
-    # sleep 5 seconds so the workers have time to run
-    await asyncio.sleep(5)
-    await worker_pool.shutdown()
+    # Mission should be already created in InOrbit during the dispatching. Here we mock that by
+    # passing the mission tasks, so the mission gets created in Mission Tracking when it starts.
+    # This is not needed in real scenarios, as the mission is already created in InOrbit.
+    # Missions are submitted concurrently. If batching is enabled, the requests creating them
+    # in Mission Tracking when they start are sent together.
+    tasks = [
+        {"taskId": "step 0", "label": "Step 0"},
+        {"taskId": "step 1", "label": "Step 1"},
+        {"taskId": "step 2", "label": "Step 2"},
+        {"taskId": "step 3", "label": "Then waypoint A"},
+        {"taskId": "step 4", "label": "Else waypoint B"},
+    ]
+    logger.info("Executing missions %s", [mission.id for mission in missions])
+    try:
+        results = await asyncio.gather(
+            *(
+                worker_pool.submit_work(mission=mission, options=options, tasks=tasks)
+                for mission in missions
+            ),
+            return_exceptions=True,
+        )
+        for mission, result in zip(missions, results):
+            # e.g. RobotBusyException, if a mission resumed from the DB is running on the robot
+            if isinstance(result, Exception):
+                logger.error("Could not execute mission %s: %r", mission.id, result)
+        # Wait until all the missions end
+        await worker_pool.join()
+    finally:
+        await worker_pool.shutdown()
+        # Close the connections held by the API client
+        await inorbit_api.aclose()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    log_listener = setup_logging()
+    # Use uvloop when available: its event loop is implemented on top of libuv and has a
+    # lower overhead per callback than the default asyncio loop.
+    try:
+        import uvloop
+    except ImportError:
+        uvloop = None
+    try:
+        if uvloop is None:
+            asyncio.run(main())
+        elif sys.version_info >= (3, 11):
+            uvloop.run(main())
+        else:
+            uvloop.install()
+            asyncio.run(main())
+    finally:
+        log_listener.stop()
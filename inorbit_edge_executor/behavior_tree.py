@@ -20,6 +20,8 @@ TODOs in this file:
 """
 
 import asyncio
+import functools
+import inspect
 import sys
 import traceback
 from datetime import datetime
@@ -27,8 +29,10 @@ from typing import Dict
 from typing import List
 from typing import Union
 from typing import Callable
+from typing import Optional
 
 from async_timeout import timeout
+from pydantic import TypeAdapter
 
 from .datatypes import MissionRuntimeOptions
 from .datatypes import MissionRuntimeSharedMemory
@@ -39,8 +43,11 @@ from .datatypes import MissionStepSetData
 from .datatypes import MissionStepWait
 from .datatypes import MissionStepWaitUntil
 from .datatypes import MissionStepIf
+from .datatypes import StepsList
 from .datatypes import Target
 from .exceptions import TaskPausedException
+from .exceptions import UnsupportedExpressionException
+from .expr import evaluate_expr
 from .inorbit import ACTION_CANCEL_NAV_ID
 from .inorbit import ACTION_NAVIGATE_TO_ID
 from .inorbit import MissionStatus
@@ -167,6 +174,8 @@ class BehaviorTree(Observable):
         added by dump_object(). (See examples in various classes in this file)
       - List the class in accepted_node_types[] list (by the end of this file) to register it
         for (de)serialization
+      - Alternatively, leaf nodes defined outside this file can use the @bt_node decorator,
+        which generates dump_object() and from_object() from __init__ and registers the class
       - Any node type with sub-nodes (non-leaf node) must reimplement collect_nodes to list
         all nodes in the tree
     """
@@ -691,8 +700,9 @@ class WaitExpressionNode(BehaviorTree):
 class IfNode(BehaviorTree):
     """
     Node that evaluates an expression once and conditionally executes either a "then" or "else"
-    branch based on the result. The expression is evaluated through REST APIs, normally in the same
-    robot that executes the mission.
+    branch based on the result. Constant expressions (see expr.py) are evaluated locally. Other
+    expressions are evaluated through REST APIs, normally in the same robot that executes the
+    mission.
     """
 
     def __init__(
@@ -717,6 +727,30 @@ class IfNode(BehaviorTree):
             self.robot = context.robot_api_factory.build(self.target.robot_id)
 
     async def _execute(self):
+        try:
+            result = evaluate_expr(self.expression)
+            logger.debug(f"evaluated expression {self.expression} locally")
+        except UnsupportedExpressionException:
+            result = await self._evaluate_remotely()
+
+        if result:
+            logger.debug(f"expression {self.expression} == true, executing then branch")
+            await self.then_branch.execute()
+            self.state = self.then_branch.state
+            self.last_error = self.then_branch.last_error
+        else:
+            if self.else_branch is not None:
+                logger.debug(f"expression {self.expression} == false, executing else branch")
+                await self.else_branch.execute()
+                self.state = self.else_branch.state
+                self.last_error = self.else_branch.last_error
+            else:
+                logger.debug(f"expression {self.expression} == false, no else branch, succeeding")
+                # No else branch, succeed (no-op)
+                self.state = NODE_STATE_SUCCESS
+                self.last_error = ""
+
+    async def _evaluate_remotely(self):
         logger.debug(f"evaluating expression {self.expression} on {self.robot.robot_id}")
         try:
             result = None
@@ -742,23 +776,7 @@ class IfNode(BehaviorTree):
         except Exception as e:
             logger.error(f"Error evaluating expression {self.expression}: {e}")
             raise e
-
-        if result:
-            logger.debug(f"expression {self.expression} == true, executing then branch")
-            await self.then_branch.execute()
-            self.state = self.then_branch.state
-            self.last_error = self.then_branch.last_error
-        else:
-            if self.else_branch is not None:
-                logger.debug(f"expression {self.expression} == false, executing else branch")
-                await self.else_branch.execute()
-                self.state = self.else_branch.state
-                self.last_error = self.else_branch.last_error
-            else:
-                logger.debug(f"expression {self.expression} == false, no else branch, succeeding")
-                # No else branch, succeed (no-op)
-                self.state = NODE_STATE_SUCCESS
-                self.last_error = ""
+        return result
 
     def reset_execution(self):
         super().reset_execution()
@@ -1097,6 +1115,17 @@ class MissionStepCancelledNode(BehaviorTree):
 
 
 class NodeFromStepBuilder:
+    # visit_* method used for each step type (matching MissionStep.accept()), used to dispatch
+    # steps with a single lookup in visit()
+    VISIT_METHOD_NAMES = {
+        MissionStepWait: "visit_wait",
+        MissionStepSetData: "visit_set_data",
+        MissionStepPoseWaypoint: "visit_pose_waypoint",
+        MissionStepWaitUntil: "visit_wait_until",
+        MissionStepRunAction: "visit_run_action",
+        MissionStepIf: "visit_if",
+    }
+
     def __init__(self, context: BehaviorTreeBuilderContext):
         """
         Implements the visitor pattern for building behavior tree nodes from mission steps.
@@ -1120,6 +1149,25 @@ class NodeFromStepBuilder:
                 self.waypoint_distance_tolerance = float(args[WAYPOINT_DISTANCE_TOLERANCE])
             if WAYPOINT_ANGULAR_TOLERANCE in args:
                 self.waypoint_angular_tolerance = float(args[WAYPOINT_ANGULAR_TOLERANCE])
+        self._build_dispatch_table()
+
+    def _build_dispatch_table(self):
+        # Bound methods are resolved once here, so they include overrides by subclasses and
+        # methods patched by add_step_node_decorator()
+        self._dispatch = {
+            step_type: getattr(self, method_name)
+            for step_type, method_name in self.VISIT_METHOD_NAMES.items()
+        }
+
+    def visit(self, step: MissionStep):
+        """
+        Builds the node for a step. Equivalent to step.accept(self), but steps of the known types
+        are dispatched with a single dict lookup.
+        """
+        visit_method = self._dispatch.get(type(step))
+        if visit_method is None:
+            return step.accept(self)
+        return visit_method(step)
 
     def add_step_node_decorator(
         self, step_decorator_fn: Callable[[MissionStep, BehaviorTree], BehaviorTree]
@@ -1141,6 +1189,7 @@ class NodeFromStepBuilder:
                     return visit_method
 
                 setattr(self, attr_name, make_wrapped(orig_method))
+        self._build_dispatch_table()
 
     def visit_wait(self, step: MissionStepWait):
         return WaitNode(self.context, step.timeout_secs, label=step.label)
@@ -1269,23 +1318,35 @@ class NodeFromStepBuilder:
             context=self.context, expression=step.expression, target=step.target, label=step.label
         )
 
+    def _build_branch(self, label: str, steps: StepsList) -> BehaviorTreeSequential:
+        branch = BehaviorTreeSequential(label=label)
+        for branch_step in steps:
+            node = self.visit(branch_step)
+            if node:
+                branch.add_node(node)
+        return branch
+
     def visit_if(self, step: MissionStepIf):
-        # Build the behavior tree nodes for the then branch
         then_label = f"{step.label} - then" if step.label else "then"
-        then_branch = BehaviorTreeSequential(label=then_label)
-        for then_step in step.then:
-            node = then_step.accept(self)
-            if node:
-                then_branch.add_node(node)
+        else_label = f"{step.label} - else" if step.label else "else"
+        # If the expression only depends on constants, its result is known now: build only the
+        # branch that will be executed, with no IfNode. Mission arguments are not resolved here,
+        # as InOrbit does not receive them when evaluating the expression remotely
+        try:
+            result = evaluate_expr(step.expression)
+        except UnsupportedExpressionException:
+            pass
+        else:
+            logger.debug(f"expression {step.expression} folded at build time: {result}")
+            if result:
+                return self._build_branch(then_label, step.then)
+            return self._build_branch(else_label, step.else_ or [])
+        # Build the behavior tree nodes for the then branch
+        then_branch = self._build_branch(then_label, step.then)
         # Build the behavior tree nodes for the else branch (if it exists)
         else_branch = None
         if step.else_ is not None:
-            else_label = f"{step.label} - else" if step.label else "else"
-            else_branch = BehaviorTreeSequential(label=else_label)
-            for else_step in step.else_:
-                node = else_step.accept(self)
-                if node:
-                    else_branch.add_node(node)
+            else_branch = self._build_branch(else_label, step.else_)
         # Create the if node
         if_node = IfNode(
             context=self.context,
@@ -1321,26 +1382,127 @@ accepted_node_types = [
     MissionInProgressNode,
     MissionStepCancelledNode,
 ]
-tree_node_class_map = {}
+# Maps the "type" stored in serialized nodes (see BehaviorTree.dump_object) to its class, so
+# deserializing a node is a single lookup regardless of how many types are registered.
+tree_node_class_map: Dict[str, type] = {}
 
 
 def register_accepted_node_types(node_type_classes):
     logger.debug(f"Registering accepted node types: {node_type_classes}")
-    for clazz in node_type_classes:
-        tree_node_class_map[clazz.__name__] = clazz
+    tree_node_class_map.update({clazz.__name__: clazz for clazz in node_type_classes})
 
 
 register_accepted_node_types(accepted_node_types)
 
 
+def _field_type_adapter(clazz, field: inspect.Parameter) -> TypeAdapter:
+    annotation = field.annotation
+    if annotation is field.empty:
+        return None
+    try:
+        if isinstance(annotation, str):
+            # e.g. with "from __future__ import annotations". Resolved one by one (instead of
+            # with get_type_hints()), so one annotation that cannot be resolved fails on its own
+            annotation = eval(annotation, clazz.__init__.__globals__)
+        # Optional, since nodes often default their fields to None
+        return TypeAdapter(Optional[annotation])
+    except Exception as e:
+        raise TypeError(
+            f"@bt_node: cannot (de)serialize {clazz.__qualname__}.{field.name} ({annotation})"
+        ) from e
+
+
+def bt_node(clazz):
+    """
+    Class decorator for leaf BehaviorTree subclasses whose state is fully defined by the named
+    parameters of their __init__ (besides context), each stored in an attribute of the same name.
+    It generates the dump_object() and from_object() methods, unless the class defines them, and
+    registers the class with register_accepted_node_types(). The serialized format is the same as
+    with handwritten methods: the fields of BehaviorTree.dump_object() plus one key per parameter.
+
+    Values of annotated parameters are dumped to JSON compatible values with pydantic, according
+    to their annotation, and validated back to it when deserializing; e.g. a Pose is persisted
+    as a dict and restored as a Pose. Values of parameters without annotation are persisted as
+    they are, so they must be JSON serializable. Annotations that cannot be resolved at module
+    level, or that pydantic cannot handle, raise TypeError.
+
+    Example:
+
+        @bt_node
+        class MyNode(BehaviorTree):
+            def __init__(self, context, waypoint: Pose, speed: float = 1.0, **kwargs):
+                super().__init__(**kwargs)
+                self.waypoint = waypoint
+                self.speed = speed
+    """
+    parameters = list(inspect.signature(clazz.__init__).parameters.values())[1:]
+    takes_context = any(parameter.name == "context" for parameter in parameters)
+    fields = [
+        parameter
+        for parameter in parameters
+        if parameter.name != "context"
+        and parameter.kind in (parameter.POSITIONAL_OR_KEYWORD, parameter.KEYWORD_ONLY)
+    ]
+    adapters = {field.name: _field_type_adapter(clazz, field) for field in fields}
+    # Generate the methods' source, like dataclasses do, so (de)serializing a node is a sequence
+    # of plain statements instead of a loop over its fields
+    namespace = {"_super_dump_object": super(clazz, clazz).dump_object}
+    for name, adapter in adapters.items():
+        if adapter is not None:
+            namespace[f"_dump_{name}"] = functools.partial(
+                adapter.dump_python, mode="json", by_alias=True, exclude_none=True
+            )
+            namespace[f"_load_{name}"] = adapter.validate_python
+    generated = []
+    if "dump_object" not in clazz.__dict__:
+        lines = ["def dump_object(self):", "    object = _super_dump_object(self)"]
+        for f in fields:
+            value = f"_dump_{f.name}(self.{f.name})" if adapters[f.name] else f"self.{f.name}"
+            lines.append(f'    object["{f.name}"] = {value}')
+        lines.append("    return object")
+        generated.append("\n".join(lines))
+    if "from_object" not in clazz.__dict__:
+        # All keyword-only, so defaults can be in any order, as in __init__'s keyword-only ones
+        args = []
+        for field in fields:
+            if field.default is field.empty:
+                args.append(field.name)
+            else:
+                namespace[f"_default_{field.name}"] = field.default
+                args.append(f"{field.name}=_default_{field.name}")
+        call_args = [
+            f"{f.name}=_load_{f.name}({f.name})" if adapters[f.name] else f"{f.name}={f.name}"
+            for f in fields
+        ]
+        if takes_context:
+            call_args.insert(0, "context=context")
+        signature = (["*"] + args if args else []) + ["**kwargs"]
+        lines = [f"def from_object(cls, context, {', '.join(signature)}):"]
+        lines.append(f"    return cls({', '.join(call_args + ['**kwargs'])})")
+        generated.append("\n".join(lines))
+    if generated:
+        source = "\n\n".join(generated)
+        exec(compile(source, f"<bt_node {clazz.__qualname__}>", "exec"), namespace)
+    for method_name in ("dump_object", "from_object"):
+        if method_name in namespace:
+            method = namespace[method_name]
+            method.__qualname__ = f"{clazz.__qualname__}.{method_name}"
+            setattr(
+                clazz,
+                method_name,
+                classmethod(method) if method_name == "from_object" else method,
+            )
+    register_accepted_node_types([clazz])
+    return clazz
+
+
 def build_tree_from_object(context: BehaviorTreeBuilderContext, object: dict):
-    node_type = object["type"] if object else None
-    if node_type not in tree_node_class_map:
+    node_type = object.pop("type", None) if object else None
+    clazz = tree_node_class_map.get(node_type)
+    if clazz is None:
         traceback.print_stack(file=sys.stdout)
         raise Exception(f"Unknown node type from serialized state: {node_type}")
 
-    clazz = tree_node_class_map[node_type]
-    del object["type"]
     node = clazz.from_object(context=context, **object)
     return node
 
@@ -1416,9 +1578,9 @@ class DefaultTreeBuilder(TreeBuilder):
         step_builder = self._step_builder_factory(context)
         step_builder.add_step_node_decorator(self._build_step_decorator_for_context(context))
 
-        for step, ix in zip(mission.definition.steps, range(len(mission.definition.steps))):
+        for ix, step in enumerate(mission.definition.steps):
             try:
-                node = step.accept(step_builder)
+                node = step_builder.visit(step)
             except Exception as e:  # TODO
                 raise Exception(f"Error building step #{ix} [{step}]: {str(e)}")
             if node:
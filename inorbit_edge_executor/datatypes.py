@@ -7,15 +7,19 @@ datatypes
 Defines different types shared by various modules.
 """
 
+import functools
 from enum import Enum
 from typing import Any
 from typing import Dict
 from typing import List
 from typing import Optional
 from typing import Union
+
+import orjson
 from pydantic import BaseModel
 from pydantic import ConfigDict
 from pydantic import Field
+from pydantic import TypeAdapter
 from pydantic import model_validator
 
 
@@ -44,9 +48,14 @@ class Robot(BaseModel):
 
 class Pose(BaseModel):
     """
-    Waypoint to be used for MissionStepPoseWaypoint
+    Waypoint to be used for MissionStepPoseWaypoint.
+
+    Poses are immutable, so they can be shared between steps and nodes without copying and
+    used as dict keys.
     """
 
+    model_config = ConfigDict(frozen=True)
+
     x: float
     y: float
     theta: Optional[float] = Field(default=None)
@@ -273,18 +282,55 @@ class MissionStepIf(MissionStep):
         return MissionStepTypes.IF.value
 
 
-# Type alias for steps list that includes all step types including MissionStepIf
-StepsList = List[
-    Union[
-        MissionStepSetData,
-        MissionStepPoseWaypoint,
-        MissionStepRunAction,
-        MissionStepWait,
-        MissionStepWaitUntil,
-        MissionStepIf,
-    ]
+# Type alias for any of the step types, including MissionStepIf
+AnyMissionStep = Union[
+    MissionStepSetData,
+    MissionStepPoseWaypoint,
+    MissionStepRunAction,
+    MissionStepWait,
+    MissionStepWaitUntil,
+    MissionStepIf,
 ]
 
+# Type alias for steps list that includes all step types including MissionStepIf
+StepsList = List[AnyMissionStep]
+
+# MissionStepIf refers to StepsList before it's defined, so pydantic defers building its schema
+# until it's first used. Build it now, at import, instead of while handling the first mission.
+MissionStepIf.IfArgs.model_rebuild()
+MissionStepIf.model_rebuild()
+
+
+@functools.lru_cache(maxsize=None)
+def _get_type_adapter(step_type) -> TypeAdapter:
+    return TypeAdapter(step_type)
+
+
+@functools.lru_cache(maxsize=4096)
+def _validate_step(step_type, frozen_json: bytes):
+    return _get_type_adapter(step_type).validate_json(frozen_json)
+
+
+def validate_step_cached(step: dict, step_type=AnyMissionStep):
+    """
+    Validates a step dict as step_type (by default, any of the mission step types). Validated
+    steps are cached by their canonical JSON, so validating an identical step again returns a
+    copy of the cached step without running validation. Each call returns a new step, so its
+    fields can be reassigned (e.g. in WorkerPool.translate_step()) without affecting other
+    missions; nested values are shared and must be replaced rather than modified in place.
+    """
+    try:
+        frozen_json = orjson.dumps(step, option=orjson.OPT_SORT_KEYS)
+    except TypeError:
+        # Not JSON serializable (e.g. non-str keys); validate it without caching
+        return _get_type_adapter(step_type).validate_python(step)
+    # A shallow copy is much cheaper than validating again (or a deep copy)
+    return _validate_step(step_type, frozen_json).model_copy()
+
+
+# Like the schemas above, build the adapter used by default by validate_step_cached() at import
+_get_type_adapter(AnyMissionStep)
+
 
 class MissionDefinition(BaseModel):
     """
@@ -299,6 +345,19 @@ class MissionDefinition(BaseModel):
     planner: Any = Field(default=None)
     model_config = ConfigDict(extra="forbid")
 
+    @classmethod
+    def from_cached_dict(cls, definition: dict) -> "MissionDefinition":
+        """
+        Builds a MissionDefinition from a dict, as model_validate() does, but reusing the
+        already validated steps for steps seen before (see validate_step_cached()). Useful when
+        the same definitions are submitted repeatedly.
+        """
+        steps = [
+            validate_step_cached(step) if isinstance(step, dict) else step
+            for step in definition.get("steps", [])
+        ]
+        return cls.model_validate({**definition, "steps": steps})
+
 
 class MissionTask(BaseModel):
     """
@@ -41,3 +41,21 @@ class MissionNotFoundException(Exception):
     """
 
     pass
+
+
+class UnsupportedExpressionException(Exception):
+    """
+    UnsupportedExpressionException is raised when an expression cannot be evaluated locally (see
+    expr.py), and it must be evaluated through InOrbit APIs instead.
+    """
+
+    pass
+
+
+class MissionCreationException(Exception):
+    """
+    MissionCreationException is raised when a mission that the executor must create in Mission
+    Tracking (see MissionTrackingMission.set_create_on_start()) could not be created.
+    """
+
+    pass
@@ -0,0 +1,191 @@
+# SPDX-FileCopyrightText: 2024 InOrbit, Inc.
+#
+# SPDX-License-Identifier: MIT
+"""
+expr
+
+Local evaluation of simple expressions (e.g. "0 > 1") found in mission definitions, so they do
+not require a request to InOrbit's expression evaluation API.
+
+Only constant expressions are accepted: constants combined with comparisons, boolean and
+arithmetic operators. Anything else (e.g. names, function calls like getValue(), or multiple
+statements) raises UnsupportedExpressionException and must be evaluated by InOrbit. Names are
+not resolved from the mission arguments, since InOrbit does not receive them either. Operators are only evaluated
+locally on operands of the same kind (numbers, strings or booleans), where Python gives the same
+result as InOrbit; mixed kinds (e.g. "5" == 5, or 'ab' * 2) are also left to InOrbit. Likewise,
+and, or and not only take the truth value of numbers, strings and booleans.
+
+Functions:
+    compile_expr: parses and validates an expression.
+    evaluate_expr: evaluates an expression locally.
+"""
+
+import ast
+import functools
+import operator
+from typing import Any
+from typing import Optional
+
+from .exceptions import UnsupportedExpressionException
+
+# AST node types accepted in expressions evaluated locally
+ALLOWED_NODE_TYPES = (
+    ast.Expression,
+    ast.Constant,
+    ast.Load,
+    ast.Compare,
+    ast.BoolOp,
+    ast.BinOp,
+    ast.UnaryOp,
+    ast.And,
+    ast.Or,
+    ast.Not,
+    ast.UAdd,
+    ast.USub,
+    ast.Eq,
+    ast.NotEq,
+    ast.Lt,
+    ast.LtE,
+    ast.Gt,
+    ast.GtE,
+    ast.Add,
+    ast.Sub,
+    ast.Mult,
+    ast.Div,
+)
+ALLOWED_CONSTANT_TYPES = (bool, int, float, str, type(None))
+
+# Operators, and the kinds of operands (see _kind()) they are evaluated locally for. Both operands
+# must be of the same kind.
+COMPARE_OPERATORS = {
+    ast.Eq: (operator.eq, ("number", "str", "bool")),
+    ast.NotEq: (operator.ne, ("number", "str", "bool")),
+    ast.Lt: (operator.lt, ("number", "str")),
+    ast.LtE: (operator.le, ("number", "str")),
+    ast.Gt: (operator.gt, ("number", "str")),
+    ast.GtE: (operator.ge, ("number", "str")),
+}
+BINARY_OPERATORS = {
+    ast.Add: (operator.add, ("number", "str")),
+    ast.Sub: (operator.sub, ("number",)),
+    ast.Mult: (operator.mul, ("number",)),
+    ast.Div: (operator.truediv, ("number",)),
+}
+UNARY_OPERATORS = {
+    ast.UAdd: (operator.pos, ("number",)),
+    ast.USub: (operator.neg, ("number",)),
+}
+# Kinds of operands whose truth value (for and, or, not) is evaluated locally
+BOOLEAN_OPERAND_KINDS = ("bool", "number", "str")
+
+
+class _ExpressionValidator(ast.NodeVisitor):
+    """Rejects any AST node not in the whitelist of nodes evaluated locally"""
+
+    def generic_visit(self, node):
+        if not isinstance(node, ALLOWED_NODE_TYPES):
+            raise UnsupportedExpressionException(f"Unsupported node {type(node).__name__}")
+        super().generic_visit(node)
+
+    def visit_Constant(self, node: ast.Constant):
+        if not isinstance(node.value, ALLOWED_CONSTANT_TYPES):
+            raise UnsupportedExpressionException(f"Unsupported constant {node.value!r}")
+
+    def visit_Compare(self, node: ast.Compare):
+        # Chained comparisons (a < b < c) are evaluated left to right by InOrbit, not as Python
+        # does, so leave them to InOrbit
+        if len(node.ops) > 1:
+            raise UnsupportedExpressionException("Unsupported chained comparison")
+        self.generic_visit(node)
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile(expression: str) -> Optional[ast.Expression]:
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+        _ExpressionValidator().visit(tree)
+    except (SyntaxError, UnsupportedExpressionException):
+        return None
+    return tree
+
+
+def compile_expr(expression: str) -> ast.Expression:
+    """
+    Parses an expression and validates that it can be evaluated locally. Results are cached.
+    Raises UnsupportedExpressionException if the expression cannot be evaluated locally.
+    """
+    tree = _compile(expression)
+    if tree is None:
+        raise UnsupportedExpressionException(f"Cannot evaluate expression locally: {expression}")
+    return tree
+
+
+def _kind(value) -> str:
+    # bool is checked first, since it is a subclass of int
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, (int, float)):
+        return "number"
+    if isinstance(value, str):
+        return "str"
+    return type(value).__name__
+
+
+def _apply(operators, op: ast.AST, *operands):
+    function, kinds = operators[type(op)]
+    operand_kinds = {_kind(operand) for operand in operands}
+    if len(operand_kinds) != 1 or not operand_kinds <= set(kinds):
+        raise UnsupportedExpressionException(
+            f"Unsupported operands for {type(op).__name__}: {operand_kinds}"
+        )
+    return function(*operands)
+
+
+def _truth(value) -> bool:
+    if _kind(value) not in BOOLEAN_OPERAND_KINDS:
+        raise UnsupportedExpressionException(f"Unsupported boolean operand: {_kind(value)}")
+    return bool(value)
+
+
+def _evaluate(node: ast.AST) -> Any:
+    if isinstance(node, ast.Expression):
+        return _evaluate(node.body)
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.BoolOp):
+        # Short-circuit, returning the last evaluated operand (as both Python and InOrbit do)
+        value = None
+        for operand in node.values:
+            value = _evaluate(operand)
+            if isinstance(node.op, ast.And) != _truth(value):
+                break
+        return value
+    if isinstance(node, ast.UnaryOp):
+        operand = _evaluate(node.operand)
+        if isinstance(node.op, ast.Not):
+            return not _truth(operand)
+        return _apply(UNARY_OPERATORS, node.op, operand)
+    if isinstance(node, ast.BinOp):
+        left = _evaluate(node.left)
+        right = _evaluate(node.right)
+        return _apply(BINARY_OPERATORS, node.op, left, right)
+    if isinstance(node, ast.Compare):
+        left = _evaluate(node.left)
+        right = _evaluate(node.comparators[0])
+        return _apply(COMPARE_OPERATORS, node.ops[0], left, right)
+    raise UnsupportedExpressionException(f"Unsupported node {type(node).__name__}")
+
+
+def evaluate_expr(expression: str) -> Any:
+    """
+    Evaluates a constant expression locally. Raises UnsupportedExpressionException if the
+    expression is not supported, applies an operator to operands of different or unsupported
+    kinds, or fails to evaluate.
+    """
+    tree = compile_expr(expression)
+    try:
+        return _evaluate(tree)
+    except UnsupportedExpressionException:
+        raise
+    except Exception as e:
+        raise UnsupportedExpressionException(f"Error evaluating expression {expression}: {e}")
@@ -0,0 +1,47 @@
+# SPDX-FileCopyrightText: 2024 InOrbit, Inc.
+#
+# SPDX-License-Identifier: MIT
+"""
+ids
+
+Generation of random ids (e.g. for missions). Ids have the same format as uuid4().hex, but the
+random bytes are read from the OS in blocks instead of with one os.urandom() call per id.
+"""
+
+import os
+import threading
+
+ID_SIZE = 16
+IDS_PER_BLOCK = 1024
+
+_lock = threading.Lock()
+_buffer = b""
+_offset = 0
+
+
+def _reset():
+    global _buffer, _offset
+    _buffer = b""
+    _offset = 0
+
+
+# A forked process must not return the same ids as its parent
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset)
+
+
+def next_id() -> str:
+    """
+    Returns a new random id: 32 hex chars, a valid version 4 UUID as returned by uuid4().hex.
+    """
+    global _buffer, _offset
+    with _lock:
+        if _offset >= len(_buffer):
+            _buffer = os.urandom(ID_SIZE * IDS_PER_BLOCK)
+            _offset = 0
+        id_bytes = bytearray(_buffer[_offset : _offset + ID_SIZE])
+        _offset += ID_SIZE
+    # Set the version (4) and variant (RFC 4122) bits, as uuid.uuid4() does
+    id_bytes[6] = (id_bytes[6] & 0x0F) | 0x40
+    id_bytes[8] = (id_bytes[8] & 0x3F) | 0x80
+    return id_bytes.hex()
@@ -1,13 +1,16 @@
 # Wrappers around InOrbit APIs
+import asyncio
 import json
 import logging
 from datetime import datetime
 from enum import Enum
 
 import httpx
+import orjson
 
 from .datatypes import Pose
 from .datatypes import Robot
+from .exceptions import MissionCreationException
 from .mission import Mission
 from .mission import MissionTask
 from .logger import setup_logger
@@ -99,6 +102,9 @@ ARG_KEY_EXPRESSION = "_expression"
 # parameterized API paths)
 
 
+MISSIONS_API_PATH = "missions"
+
+
 def build_mission_api_path(mission_id):
     return f"missions/{mission_id}"
 
@@ -131,15 +137,73 @@ def build_expression_eval_api_path(robot_id):
     return f"expressions/robot/{robot_id}/eval"
 
 
+def build_batch_api_path(path):
+    return f"{path.rstrip('/')}/batch"
+
+
+JSON_CONTENT_TYPE_HEADERS = {"content-type": "application/json"}
+
+# Limits for the adaptive batching window of InOrbitAPI.post_batched(), in milliseconds
+BATCH_WINDOW_MS_MIN = 1
+BATCH_WINDOW_MS_MAX = 100
+
+
 class InOrbitAPI:
     HTTP_PEER_KEY_HEADER = "x-auth-inorbit-peer-key"
     HTTP_API_KEY_HEADER = "x-auth-inorbit-app-key"
 
-    def __init__(self, base_url="https://api.inorbit.ai", api_key=None, peer_key=None):
+    def __init__(
+        self,
+        base_url="https://api.inorbit.ai",
+        api_key=None,
+        peer_key=None,
+        batch_window_ms: float = None,
+        max_batch: int = 64,
+    ):
+        """
+        Args:
+            base_url: InOrbit API base URL.
+            api_key: InOrbit API key (app key).
+            peer_key: InOrbit peer key, used instead of an api_key by some services.
+            batch_window_ms: If set, POSTs sent with post_batched() to the same path within this
+                time window are coalesced into a single request to the path's bulk endpoint
+                (see build_batch_api_path()). The window adapts to the load. Batching is
+                disabled by default.
+            max_batch: Maximum number of requests coalesced in a single bulk request.
+        """
         logger.info("InOrbit API: " + base_url)
         self._base_url = base_url.rstrip("/")
         self._api_key = api_key
         self._peer_key = peer_key
+        self._batch_window_ms = batch_window_ms
+        self._max_batch = max_batch
+        # Queue of (path, body, future) waiting to be sent by the batcher task. Only set while
+        # batching is running; see start_batching()
+        self._batch_queue: asyncio.Queue = None
+        self._batcher_task: asyncio.Task = None
+        # A single long-lived client, so all requests share its pool of keep-alive connections
+        # (and with HTTP/2, concurrent requests are multiplexed over the same connection)
+        # instead of paying a TCP and TLS handshake per request.
+        self._client = httpx.AsyncClient(
+            base_url=self._base_url,
+            headers=self.headers,
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=64, max_connections=128),
+            timeout=httpx.Timeout(10.0, connect=2.0),
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """
+        Stops batching and closes the underlying HTTP client, and its connections.
+        """
+        await self.stop_batching()
+        await self._client.aclose()
 
     @property
     def headers(self):
@@ -151,27 +215,125 @@ class InOrbitAPI:
         return headers
 
     async def get(self, path):
-        async with httpx.AsyncClient() as client:
-            return await client.get(f"{self._base_url}/{path}", headers=self.headers)
+        return await self._request("GET", path)
 
     async def post(self, path, body):
-        async with httpx.AsyncClient() as client:
-            return await client.post(f"{self._base_url}/{path}", json=body, headers=self.headers)
+        return await self._request("POST", path, body)
 
     async def put(self, path, body=None):
-        async with httpx.AsyncClient() as client:
-            return await client.put(f"{self._base_url}/{path}", json=body, headers=self.headers)
+        return await self._request("PUT", path, body)
 
     async def delete(self, path, body=None):
-        async with httpx.AsyncClient() as client:
-            if not body:
-                return await client.delete(f"{self._base_url}/{path}", headers=self.headers)
+        return await self._request("DELETE", path, body if body else None)
+
+    async def _request(self, method, path, body=None):
+        if body is None:
+            return await self._client.request(method, path)
+        # Encode with orjson instead of letting httpx use the (slower) stdlib json encoder.
+        # Non-str keys are accepted and converted to strings, as the stdlib encoder does.
+        content = orjson.dumps(body, option=orjson.OPT_NON_STR_KEYS)
+        return await self._client.request(
+            method, path, content=content, headers=JSON_CONTENT_TYPE_HEADERS
+        )
+
+    async def post_batched(self, path, body):
+        """
+        POSTs body to path, coalescing it with other POSTs to the same path sent within the
+        batching window into a single request to the bulk endpoint of the path. The bulk endpoint
+        receives a list of bodies and must reply with a list of results, in the same order.
+
+        Returns the decoded JSON result for this body, or None if the reply to a request sent on
+        its own has no content (e.g. 204); raises on HTTP or network errors. When batching is not
+        running (see start_batching()) the body is POSTed directly.
+        """
+        if self._batcher_task is None:
+            resp = await self.post(path, body)
+            resp.raise_for_status()
+            return _decode_result(resp)
+        future = asyncio.get_running_loop().create_future()
+        self._batch_queue.put_nowait((path, body, future))
+        return await future
+
+    async def start_batching(self):
+        """
+        Starts the background task that sends requests queued by post_batched(). It does nothing
+        if batching was not enabled with batch_window_ms.
+        """
+        if self._batch_window_ms is None or self._batcher_task is not None:
+            return
+        self._batch_queue = asyncio.Queue()
+        self._batcher_task = asyncio.create_task(self._run_batcher(self._batch_window_ms))
+
+    async def stop_batching(self):
+        """
+        Stops the batcher task, after sending any request already queued.
+        """
+        if self._batcher_task is None:
+            return
+        task = self._batcher_task
+        self._batcher_task = None
+        # A None item tells the batcher to stop once the current batch is sent
+        self._batch_queue.put_nowait(None)
+        await task
+
+    async def _run_batcher(self, window_ms):
+        while True:
+            item = await self._batch_queue.get()
+            if item is None:
+                return
+            await asyncio.sleep(window_ms / 1000)
+            batch = [item]
+            stopping = False
+            while len(batch) < self._max_batch and not self._batch_queue.empty():
+                item = self._batch_queue.get_nowait()
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            # Adapt the window: shrink it when traffic is low (nothing else arrived while
+            # waiting), so single requests are not delayed; grow it when many requests are in
+            # flight so they are coalesced in fewer, larger batches.
+            if len(batch) == 1:
+                window_ms = max(window_ms / 2, BATCH_WINDOW_MS_MIN)
+            elif len(batch) >= self._max_batch // 2:
+                window_ms = min(window_ms * 2, BATCH_WINDOW_MS_MAX)
+            batches_by_path = {}
+            for path, body, future in batch:
+                batches_by_path.setdefault(path, []).append((body, future))
+            await asyncio.gather(
+                *(self._send_batch(path, entries) for path, entries in batches_by_path.items())
+            )
+            if stopping:
+                return
+
+    async def _send_batch(self, path, entries):
+        futures = [future for _, future in entries]
+        try:
+            if len(entries) == 1:
+                # No need to use the bulk endpoint for a single request
+                resp = await self.post(path, entries[0][0])
+                resp.raise_for_status()
+                results = [_decode_result(resp)]
             else:
-                # httpx library does not allow sending a body payload in DELETE requests (as it appears
-                # to be a non-recommended practice). Instead, se request() directly; which is equivalent
-                return await client.request(
-                    method="DELETE", url=f"{self._base_url}/{path}", json=body, headers=self.headers
-                )
+                resp = await self.post(build_batch_api_path(path), [body for body, _ in entries])
+                resp.raise_for_status()
+                results = orjson.loads(resp.content)
+                if not isinstance(results, list) or len(results) != len(entries):
+                    raise Exception(f"Unexpected response from batch endpoint of {path}")
+        except Exception as e:
+            logger.warning(f"Error sending batch of {len(entries)} requests to {path}: {e}")
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future, result in zip(futures, results):
+            if not future.done():
+                future.set_result(result)
+
+
+def _decode_result(resp: httpx.Response):
+    # Successful replies to single requests may have no content, e.g. 201 or 204
+    return orjson.loads(resp.content) if resp.content else None
 
 
 class MissionTrackingMission:
@@ -181,6 +343,15 @@ class MissionTrackingMission:
         self._id = mission.id
         self._mission = mission
 
+    def set_create_on_start(self, create_on_start: bool):
+        """
+        Makes start() or mark_in_progress(), whichever runs first, create the mission (with its
+        tasks) in Mission Tracking instead of updating an existing one. Normally missions are
+        created by InOrbit's dispatcher before dispatching them to the executor. The flag is
+        stored in the mission (Mission.create_on_start), so it's persisted with it.
+        """
+        self._mission.create_on_start = create_on_start
+
     @property
     def id(self):
         return self._id
@@ -246,8 +417,11 @@ class MissionTrackingAPI(MissionTrackingMission):
 
     async def start(self):
         """
-        Starts a new Mission in Mission Tracking API and marks it as in progress.
+        Starts a new Mission in Mission Tracking API and marks it as in progress. If
+        set_create_on_start() was called, the mission is created already started.
         """
+        if self._mission.create_on_start:
+            return await self._create(MissionState.starting, in_progress=False)
         try:
             req = {
                 "state": str(MissionState.starting),
@@ -281,8 +455,11 @@ class MissionTrackingAPI(MissionTrackingMission):
 
     async def mark_in_progress(self):
         """
-        Marks a mission as in progress on Mission Tracking API.
+        Marks a mission as in progress on Mission Tracking API. If set_create_on_start() was
+        called, the mission is created already in progress, in a single request.
         """
+        if self._mission.create_on_start:
+            return await self._create(MissionState.in_progress, in_progress=True)
         try:
             req = {
                 "state": str(MissionState.in_progress),
@@ -295,6 +472,31 @@ class MissionTrackingAPI(MissionTrackingMission):
             logger.warning(f"Error marking mission as in-progress in mission-tracking {e}")
             return False
 
+    async def _create(self, state: MissionState, in_progress: bool):
+        """
+        Creates the mission in Mission Tracking. Unlike updates, failing to create it raises
+        MissionCreationException: every later update of the mission would fail too.
+        """
+        req = {
+            "missionId": self.id,
+            "robotId": self.robot_id,
+            "label": self.definition.label,
+            "state": str(state),
+            "inProgress": in_progress,
+            "tasks": self._build_tasks_list(),
+            "startTs": current_timestamp_ms(),
+        }
+        if self.arguments:
+            req["arguments"] = self.arguments
+        try:
+            # Concurrent submissions are coalesced when the API batches requests
+            await self._api.post_batched(MISSIONS_API_PATH, req)
+        except Exception as e:
+            logger.error(f"Error creating mission {self.id} in mission-tracking {e}")
+            raise MissionCreationException(f"Could not create mission {self.id}: {e}") from e
+        self._mission.create_on_start = False
+        return True
+
     async def get_mission(self):
         """
         Fetches the current mission state. Note that the mission may be changing through Mission
@@ -303,7 +505,7 @@ class MissionTrackingAPI(MissionTrackingMission):
         try:
             r = await self._api.get(build_mission_api_path(self.id))
             r.raise_for_status()
-            return r.json()
+            return orjson.loads(r.content)
         except Exception as e:
             logger.warning(f"Error fetching mission state {e}")
             # TODO count this error for metrics
@@ -527,7 +729,7 @@ class RobotApi:
         try:
             resp = await self._api.post(build_actions_api_path(self.robot_id), req)
             respData = None
-            respData = resp.json()
+            respData = orjson.loads(resp.content)
         except Exception:
             raise Exception("Error executing action")
         if resp.status_code == 200:
@@ -558,13 +760,13 @@ class RobotApi:
 
     async def get_pose(self):
         r = await self._api.get(build_pose_api_path(self.id))
-        pose = r.json()
+        pose = orjson.loads(r.content)
         return Pose(x=pose["x"], y=pose["y"], theta=pose["theta"], frame_id=pose["frameId"])
 
     async def evaluate_expression(self, expression):
         body = dict(expression=expression)
         r = await self._api.post(build_expression_eval_api_path(self.robot_id), body)
-        res = r.json()
+        res = orjson.loads(r.content)
         if not res["success"]:
             raise Exception(f"Error evaluating expression ({expression}): {res.get('message')}")
         return res["value"]
@@ -577,7 +779,7 @@ class RobotApi:
             return True
         else:
             try:
-                error = resp.json()
+                error = orjson.loads(resp.content)
             except Exception:
                 error = "<no data>"
             logger.error(
@@ -592,7 +794,7 @@ class RobotApi:
             return True
         else:
             try:
-                error = resp.json()
+                error = orjson.loads(resp.content)
             except Exception:
                 error = "<no data>"
             logger.error(
@@ -609,7 +811,7 @@ class RobotApi:
             return True
         else:
             try:
-                error = resp.json()
+                error = orjson.loads(resp.content)
             except Exception:
                 error = "<no data>"
             logger.error(f"Error {resp.status_code} locking robot {self.robot_id}: {error}")
@@ -623,7 +825,7 @@ class RobotApi:
             return True
         else:
             try:
-                error = resp.json()
+                error = orjson.loads(resp.content)
             except Exception:
                 error = "<no data>"
             logger.error(f"Error {resp.status_code} unlocking robot {self.robot_id}: {error}")
@@ -78,6 +78,9 @@ class Mission(BaseModel):
     definition: MissionDefinition
     arguments: Union[Dict[str, Any], None] = Field(default=None)
     tasks_list: List[MissionTask] = Field(default=None)  # Derived from 'definition'
+    # True if the mission does not exist yet in Mission Tracking and it must be created when it
+    # starts. Persisted with the mission, so missions resumed after a restart are still created.
+    create_on_start: bool = Field(default=False)
     model_config = ConfigDict(extra="forbid")
 
     def __init__(self, *a, **kw):
@@ -1,3 +1,4 @@
+import asyncio
 import json
 from typing import List
 
@@ -37,8 +38,8 @@ SELECT mission_id, state, robot_id FROM missions;
 -- and 'paused' flag (normally False, unpaused)
 SELECT mission_id, state, robot_id FROM missions WHERE finished = :finished and paused = :paused;
 
--- name: save-mission
--- Gets ALL mission states from DB (used during startup)
+-- name: save-missions*!
+-- Saves several mission states at once (see SqliteDB.save_mission())
 INSERT OR REPLACE INTO missions ("mission_id", "state", "finished", "robot_id", "paused")
   VALUES (:mission_id, :state, :finished, :robot_id, :paused)
 
@@ -57,6 +58,9 @@ DELETE FROM missions WHERE finished = true;
 """  # noqa: E501
 queries = aiosql.from_str(SQL_QUERIES, "aiosqlite")
 
+# Maximum number of mission states written in a single transaction
+MAX_SAVE_BATCH = 256
+
 
 def parse_row(row):
     id: str = row["mission_id"]
@@ -66,9 +70,21 @@ def parse_row(row):
 
 
 class SqliteDB(WorkerPersistenceDB):
+    """
+    SQLite storage for mission states.
+
+    Mission states are saved on every behavior tree node change, so saves are "group committed":
+    save_mission() queues the state and waits for a flusher task, which writes all states queued
+    meanwhile (keeping only the latest state of each mission) in a single transaction. The DB
+    uses a WAL journal with synchronous=NORMAL, so commits do not wait for an fsync.
+    """
+
     def __init__(self, filename):
         self.filename = filename
         self.db = None
+        # Queue of (row, future) to be written by the flusher task, or None to stop it
+        self._save_queue: asyncio.Queue = None
+        self._flusher_task: asyncio.Task = None
         logger.info(f"Constructing sqlite3 db {self.filename}")
 
     async def connect(self):
@@ -77,12 +93,22 @@ class SqliteDB(WorkerPersistenceDB):
         try:
             self.db = await aiosqlite.connect(self.filename)
             self.db.row_factory = aiosqlite.Row
+            await self.db.execute("PRAGMA journal_mode=WAL")
+            await self.db.execute("PRAGMA synchronous=NORMAL")
             await self.initialize_tables()
         except Exception as e:
             logger.error(f"Could not connect to DB {self.filename}")
             raise e
+        self._save_queue = asyncio.Queue()
+        self._flusher_task = asyncio.create_task(self._run_flusher())
 
     async def shutdown(self):
+        if self._flusher_task:
+            # Write any state still queued before closing
+            flusher_task = self._flusher_task
+            self._flusher_task = None
+            self._save_queue.put_nowait(None)
+            await flusher_task
         if self.db:
             db = self.db
             self.db = None  # make db immediately  unavailable for any other thread
@@ -142,20 +168,61 @@ class SqliteDB(WorkerPersistenceDB):
             return None
 
     async def save_mission(self, mission: MissionWorkerState):
-        if not self.db or not self.db.is_alive():
+        if not self.db or not self.db.is_alive() or self._flusher_task is None:
             # This may happen during shutdown. Instead of throwing an exception to logs (or
             # to swallow the error) let's just log a warning. If the warning appears in logs
             # after App shutdown msgs, we know they are not serious
             logger.warning("Attempt to save mission state without a DB connection; ignored")
-        await queries.save_mission(
-            self.db,
+            return
+        row = dict(
             mission_id=mission.mission_id,
             robot_id=mission.robot_id,
             state=json.dumps(mission.state),
             finished=mission.finished,
             paused=mission.paused,
         )
-        await self.db.commit()
+        future = asyncio.get_running_loop().create_future()
+        self._save_queue.put_nowait((row, future))
+        # Wait until it's committed, so the state can be read back right after saving it
+        await future
+
+    async def _run_flusher(self):
+        stopping = False
+        while not stopping:
+            item = await self._save_queue.get()
+            if item is None:
+                break
+            # Take everything queued while the previous batch was being written
+            batch = [item]
+            while len(batch) < MAX_SAVE_BATCH and not self._save_queue.empty():
+                item = self._save_queue.get_nowait()
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            # Only the latest state of each mission needs to be written
+            rows = {row["mission_id"]: row for row, _ in batch}
+            try:
+                await queries.save_missions(self.db, list(rows.values()))
+                await self.db.commit()
+            except Exception as e:
+                # Discard the rows written before the error, or the next batch would commit them
+                try:
+                    await self.db.rollback()
+                except Exception as rollback_error:
+                    logger.error(f"Could not roll back failed mission state save: {rollback_error}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(None)
+        # Saves are not accepted after shutdown() starts, but don't leave any caller waiting
+        while not self._save_queue.empty():
+            item = self._save_queue.get_nowait()
+            if item is not None and not item[1].done():
+                item[1].set_exception(RuntimeError("DB was shut down before saving mission state"))
 
     async def fetch_all_missions(self, finished=None, paused=None) -> List[MissionWorkerState]:
         """
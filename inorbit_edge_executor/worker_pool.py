@@ -6,6 +6,8 @@ execution.
 """
 
 import asyncio
+from typing import List
+from typing import Union
 
 from .behavior_tree import (
     BehaviorTreeBuilderContext,
@@ -29,6 +31,7 @@ from .exceptions import (
 from .inorbit import InOrbitAPI, MissionStatus, MissionTrackingAPI, RobotApiFactory
 from .logger import setup_logger
 from .mission import Mission
+from .mission import MissionTask
 from .worker import Worker
 from .datatypes import MissionStep
 
@@ -77,6 +80,8 @@ class WorkerPool:
         self._running = False
         # Lock to protect workers pool state
         self._mutex = asyncio.Lock()
+        # Tasks executing workers, removed when they end. Used by join()
+        self._worker_tasks = set()
         self._behavior_tree_builder = (
             behavior_tree_builder if behavior_tree_builder else DefaultTreeBuilder()
         )
@@ -88,6 +93,7 @@ class WorkerPool:
         if self._running:
             return
         self._running = True
+        await self._api.start_batching()
 
         try:
             await self._db.delete_finished_missions()
@@ -149,9 +155,26 @@ class WorkerPool:
         async with self._mutex:
             self._workers.clear()
 
+        # Send any API request still waiting to be batched
+        await self._api.stop_batching()
+
         # Shutdown the database connection
         await self._db.shutdown()
 
+    async def join(self):
+        """
+        Waits until all the missions being executed end (either finished, cancelled or paused),
+        including missions submitted while waiting.
+        """
+        while self._worker_tasks:
+            await asyncio.wait(set(self._worker_tasks))
+
+    def _start_worker(self, worker: Worker):
+        """Starts executing a worker in a new task, tracked until it ends"""
+        task = asyncio.create_task(worker.execute())
+        self._worker_tasks.add(task)
+        task.add_done_callback(self._worker_tasks.discard)
+
     async def notify(self, worker: Worker):
         """Notified when a worker changed its state. Persist it"""
         # TODO(herchu) batch these calls, marking workers as 'dirty': normally, many nodes
@@ -210,7 +233,7 @@ class WorkerPool:
             logger.debug(f"Created worker {worker.id} from serialized version")
             # Start executing this mission. The behavior tree will resume from last
             # non-executed node
-            asyncio.create_task(worker.execute())
+            self._start_worker(worker)
         except Exception as e:
             logger.warning(
                 f"Could not build worker {worker_state.mission_id} from serialized version. "
@@ -273,11 +296,38 @@ class WorkerPool:
         mission: Mission,
         options: MissionRuntimeOptions,
         shared_memory: MissionRuntimeSharedMemory = None,
+        tasks: List[Union[MissionTask, dict]] = None,
     ):
+        """
+        Starts executing a mission.
+
+        Args:
+            mission: The mission to execute.
+            options: Runtime options for the mission.
+            shared_memory: Optional shared memory for the mission's behavior tree.
+            tasks: Only for missions not yet created in Mission Tracking (normally InOrbit's
+                dispatcher creates them). If set, the mission is created with these tasks when
+                it starts, which saves creating it in a separate request. The tasks replace the
+                ones derived from the definition (e.g. to set their labels), so their ids must be
+                the same as the definition's completeTask ids. The given mission is not modified;
+                the mission executed is a copy of it with these tasks.
+        """
         if not self._running:
             raise Exception("WorkerPool is not started")
 
         mission_id = mission.id
+        if tasks is not None:
+            tasks_list = [
+                task if isinstance(task, MissionTask) else MissionTask.model_validate(task)
+                for task in tasks
+            ]
+            expected_ids = {task.task_id for task in mission.tasks_list}
+            task_ids = {task.task_id for task in tasks_list}
+            if task_ids != expected_ids:
+                raise ValueError(
+                    f"Tasks {sorted(task_ids)} don't match the mission tasks {sorted(expected_ids)}"
+                )
+            mission = mission.model_copy(update={"tasks_list": tasks_list, "create_on_start": True})
         try:
             mission = self.translate_mission(mission)
         except Exception as e:
@@ -312,7 +362,7 @@ class WorkerPool:
             await self.persist(worker)
         worker.subscribe(self)
         logger.info(f"Starting execution for mission {mission.id}.")
-        asyncio.create_task(worker.execute())
+        self._start_worker(worker)
         return {"id": mission_id}  # add status? "executing"
 
     async def persist(self, worker: Worker):
@@ -5,8 +5,14 @@ from inorbit_edge_executor.behavior_tree import (
     BehaviorTree,
     DefaultTreeBuilder,
     BehaviorTreeBuilderContext,
+    build_tree_from_object,
+    bt_node,
+    DummyNode,
+    NodeFromStepBuilder,
 )
 from inorbit_edge_executor.datatypes import MissionDefinition
+from inorbit_edge_executor.datatypes import MissionStepWait
+from inorbit_edge_executor.datatypes import Pose
 from inorbit_edge_executor.datatypes import MissionRuntimeOptions
 from inorbit_edge_executor.datatypes import MissionRuntimeSharedMemory
 from inorbit_edge_executor.dummy_backend import DummyDB
@@ -106,6 +112,100 @@ def test_bt_build_simple(inorbit_api):
     assert expected_obj == tree.dump_object()
 
 
+def test_bt_build_from_object_round_trip():
+    mission: Mission = Mission(
+        id="mission123",
+        robot_id="robot123",
+        definition=MissionDefinition(label="A mission", steps=[{"timeoutSecs": 1}]),
+    )
+    context = BehaviorTreeBuilderContext()
+    context.mission = mission
+    context.options = MissionRuntimeOptions()
+    context.shared_memory = MissionRuntimeSharedMemory()
+    tree: BehaviorTree = DefaultTreeBuilder().build_tree_for_mission(context)
+    restored = build_tree_from_object(context, tree.dump_object())
+    assert restored.dump_object() == tree.dump_object()
+
+
+def test_bt_build_from_object_unknown_type():
+    with pytest.raises(Exception, match="Unknown node type from serialized state: NoSuchNode"):
+        build_tree_from_object(BehaviorTreeBuilderContext(), {"type": "NoSuchNode"})
+
+
+@bt_node
+class _GoToNode(BehaviorTree):
+    def __init__(self, context, waypoint: Pose, speed: float = 1.0, *, mode, **kwargs):
+        super().__init__(**kwargs)
+        self.waypoint = waypoint
+        self.speed = speed
+        self.mode = mode
+        self.robot_api = context.robot_api
+
+
+def test_bt_node_decorator_round_trip():
+    context = BehaviorTreeBuilderContext()
+    node = _GoToNode(
+        context,
+        Pose(x=1.0, y=2.0, frameId="map"),
+        mode="fast",
+        label="go",
+        state="success",
+    )
+    obj = node.dump_object()
+    assert obj == {
+        "type": "_GoToNode",
+        "state": "success",
+        "label": "go",
+        "waypoint": {"x": 1.0, "y": 2.0, "frameId": "map"},
+        "speed": 1.0,
+        "mode": "fast",
+    }
+    restored = build_tree_from_object(context, dict(obj, speed=2.5))
+    assert isinstance(restored, _GoToNode)
+    assert isinstance(restored.waypoint, Pose)
+    assert restored.waypoint == node.waypoint
+    assert restored.speed == 2.5
+    assert restored.mode == "fast"
+    assert restored.label == "go"
+    assert restored.state == "success"
+
+
+def test_bt_node_decorator_rejects_unserializable_fields():
+    with pytest.raises(TypeError):
+
+        @bt_node
+        class _ContextNode(BehaviorTree):
+            def __init__(self, context, other_context: BehaviorTreeBuilderContext, **kwargs):
+                super().__init__(**kwargs)
+
+
+def test_bt_node_decorator_resolves_string_annotations():
+    @bt_node
+    class _StringAnnotatedNode(BehaviorTree):
+        def __init__(self, context, waypoint: "Pose", speed: "float" = 1.0, **kwargs):
+            super().__init__(**kwargs)
+            self.waypoint = waypoint
+            self.speed = speed
+
+    context = BehaviorTreeBuilderContext()
+    node = _StringAnnotatedNode(context, Pose(x=1.0, y=2.0, frameId="map"))
+    restored = build_tree_from_object(context, node.dump_object())
+    assert isinstance(restored.waypoint, Pose)
+    assert restored.waypoint == node.waypoint
+
+
+def test_bt_node_decorator_rejects_unresolvable_annotations():
+    class _Local:
+        pass
+
+    with pytest.raises(TypeError, match="other"):
+
+        @bt_node
+        class _UnresolvableNode(BehaviorTree):
+            def __init__(self, context, waypoint: "Pose", other: "_Local", **kwargs):
+                super().__init__(**kwargs)
+
+
 def test_bt_wait():
     """
     Tests parsing and serializing of a simple wait (timeoutSecs) node
@@ -319,6 +419,87 @@ def test_bt_if_no_else():
     assert "else_branch" not in step_node
 
 
+@pytest.mark.parametrize(
+    "expression, expected_data",
+    [
+        ("0 > 1", [{"key": "else_value"}]),
+        ("1 + 1 == 2", [{"key": "then_value"}]),
+        ("'fast' == 'slow'", [{"key": "else_value"}]),
+    ],
+)
+def test_bt_if_constant_expression_builds_taken_branch(expression, expected_data):
+    """
+    Tests that an if step with a constant expression is resolved when building the tree: only the
+    taken branch is built, with no IfNode
+    """
+    steps = [
+        {
+            "label": "if",
+            "if": {
+                "expression": expression,
+                "then": [{"data": {"key": "then_value"}}],
+                "else": [{"data": {"key": "else_value"}}],
+            },
+        }
+    ]
+    mission: Mission = Mission(
+        id="mission123",
+        robot_id="robot123",
+        definition=MissionDefinition(label="A mission", steps=steps),
+    )
+    context = BehaviorTreeBuilderContext()
+    context.mission = mission
+    context.options = MissionRuntimeOptions()
+    tree_obj = DefaultTreeBuilder().build_tree_for_mission(context).dump_object()
+    step_sequential = tree_obj["children"][0]["children"][1]
+    # LockRobotNode, taken branch
+    assert len(step_sequential["children"]) == 2
+    branch = step_sequential["children"][1]
+    assert branch["type"] == "BehaviorTreeSequential"
+    # Steps in the branch are wrapped in their own sequential (lock robot, step node)
+    assert [node["children"][1]["data"] for node in branch["children"]] == expected_data
+
+
+def test_bt_if_expression_with_arguments_is_not_folded():
+    """
+    Tests that an if step whose expression refers to mission arguments is left to an IfNode
+    """
+    steps = [{"if": {"expression": "speed >= 2", "then": [{"data": {"key": "then_value"}}]}}]
+    mission: Mission = Mission(
+        id="mission123",
+        robot_id="robot123",
+        definition=MissionDefinition(label="A mission", steps=steps),
+        arguments={"speed": 3},
+    )
+    context = BehaviorTreeBuilderContext()
+    context.mission = mission
+    context.options = MissionRuntimeOptions()
+    tree_obj = DefaultTreeBuilder().build_tree_for_mission(context).dump_object()
+    step_node = tree_obj["children"][0]["children"][1]["children"][1]
+    assert step_node["type"] == "IfNode"
+    assert step_node["expression"] == "speed >= 2"
+
+
+def test_bt_if_constant_expression_without_else():
+    steps = [{"if": {"expression": "1 > 2", "then": [{"data": {"key": "then_value"}}]}}]
+    mission: Mission = Mission(
+        id="mission123",
+        robot_id="robot123",
+        definition=MissionDefinition(label="A mission", steps=steps),
+    )
+    context = BehaviorTreeBuilderContext()
+    context.mission = mission
+    context.options = MissionRuntimeOptions()
+    tree_obj = DefaultTreeBuilder().build_tree_for_mission(context).dump_object()
+    step_sequential = tree_obj["children"][0]["children"][1]
+    assert step_sequential["children"][1] == {
+        "type": "BehaviorTreeSequential",
+        "state": "",
+        "label": "else",
+        "children": [],
+    }
+
+
 def test_bt_if_with_target():
     """
     Tests parsing and serializing of an if step with target robot
@@ -416,6 +597,29 @@ def test_visit_pose_waypoint_theta_set_includes_angular_distance():
     assert "angularDistance" in wait_node["expression"]
 
 
+def test_step_builder_visit_dispatches_to_overrides():
+    class MyWaitStep(MissionStepWait):
+        pass
+
+    class MyStepBuilder(NodeFromStepBuilder):
+        def visit_wait(self, step):
+            return DummyNode(label=f"my {step.label}")
+
+    context = BehaviorTreeBuilderContext()
+    context.mission = Mission(
+        id="mission123", robot_id="robot123", definition=MissionDefinition(steps=[])
+    )
+    context.options = MissionRuntimeOptions()
+    step_builder = MyStepBuilder(context)
+    step_builder.add_step_node_decorator(lambda step, node: [node])
+
+    (node,) = step_builder.visit(MissionStepWait(label="wait", timeoutSecs=1))
+    assert node.label == "my wait"
+    # Step types without an entry in the dispatch table go through accept()
+    (node,) = step_builder.visit(MyWaitStep(label="subclass", timeoutSecs=1))
+    assert node.label == "my subclass"
+
+
 def test_translate_step_default_returns_step_unchanged(inorbit_api):
     from inorbit_edge_executor.datatypes import MissionStepPoseWaypoint
 
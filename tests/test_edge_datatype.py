@@ -10,6 +10,7 @@ from inorbit_edge_executor.datatypes import (
     RouteSegmentCorridor,
     RouteSegmentTrajectoryNurbsParameters,
     MissionDefinition,
+    MissionStepIf,
     MissionStepPoseWaypoint,
     Pose,
 )
@@ -280,6 +281,13 @@ def test_pose_theta_when_provided():
     assert pose.theta == 1.57
 
 
+def test_pose_is_frozen_and_hashable():
+    pose = Pose(x=1.0, y=2.0, frameId="map", waypointId="A")
+    with pytest.raises(ValidationError):
+        pose.x = 3.0
+    assert {pose: "A"}[Pose(x=1.0, y=2.0, frameId="map", waypointId="A")] == "A"
+
+
 # ---------------------------------------------------------------------------
 # MissionDefinition — planner field
 # ---------------------------------------------------------------------------
@@ -326,3 +334,54 @@ def test_edge_model_dump_round_trip():
     assert restored.routeId == "route-AB"
     assert restored.corridor.width == 2.0
     assert restored.trajectory.parameters.degree == 3
+
+
+# ---------------------------------------------------------------------------
+# MissionDefinition — cached step validation
+# ---------------------------------------------------------------------------
+
+
+def test_from_cached_dict_matches_model_validate():
+    definition = {
+        "label": "A mission",
+        "steps": [
+            {"label": "set data", "data": {"key": "value"}},
+            {"waypoint": {"x": 1.0, "y": 2.0, "frameId": "map"}},
+            {"if": {"expression": "0 > 1", "then": [{"timeoutSecs": 1}]}},
+        ],
+    }
+    assert MissionDefinition.from_cached_dict(definition) == MissionDefinition.model_validate(
+        definition
+    )
+
+
+def test_from_cached_dict_reuses_validated_steps():
+    step = {"waypoint": {"x": 1.0, "y": 2.0, "frameId": "map"}}
+    first = MissionDefinition.from_cached_dict({"steps": [step]})
+    # Key order does not matter for the cache
+    second = MissionDefinition.from_cached_dict(
+        {"steps": [{"waypoint": {"frameId": "map", "y": 2.0, "x": 1.0}}]}
+    )
+    assert isinstance(first.steps[0], MissionStepPoseWaypoint)
+    assert first.steps[0] == second.steps[0]
+    # Nested values come from the cache, the steps themselves are copies
+    assert first.steps[0].waypoint is second.steps[0].waypoint
+    assert first.steps[0] is not second.steps[0]
+
+
+def test_from_cached_dict_steps_can_be_modified():
+    step = {"label": "wait", "timeoutSecs": 1}
+    first = MissionDefinition.from_cached_dict({"steps": [step]})
+    first.steps[0].label = "translated"
+    second = MissionDefinition.from_cached_dict({"steps": [step]})
+    assert second.steps[0].label == "wait"
+
+
+def test_from_cached_dict_invalid_step_fails():
+    with pytest.raises(ValidationError):
+        MissionDefinition.from_cached_dict({"steps": [{"unknown": 1}]})
+
+
+def test_step_schemas_are_built_at_import():
+    assert MissionStepIf.__pydantic_complete__
+    assert MissionStepIf.IfArgs.__pydantic_complete__
@@ -0,0 +1,74 @@
+import pytest
+
+from inorbit_edge_executor.exceptions import UnsupportedExpressionException
+from inorbit_edge_executor.expr import compile_expr, evaluate_expr
+
+
+@pytest.mark.parametrize(
+    "expression, expected",
+    [
+        ("0 > 1", False),
+        ("1 >= 1 and not 2 < 1", True),
+        ("(1 + 2) * 3 == 9", True),
+        ("-1.5 / 2", -0.75),
+        ("'a' != 'b'", True),
+        (" 0 > 1 ", False),
+    ],
+)
+def test_evaluate_constant_expressions(expression, expected):
+    assert evaluate_expr(expression) == expected
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "getValue('battery') > 50",
+        "pose = getValue('pose'); pose.x > 1",
+        "pose.x > 1",
+        "1 < 2 < 3",
+        "2 ** 3 > 1",
+        "-1 % 3",
+        "[1, 2] == [1, 2]",
+        "__import__('os')",
+        "battery > 50",  # names are not resolved locally
+        "True and speed > 1",
+        "1 / 0",
+        "getValue(",
+        "'ab' * 2",
+        "True + 1",
+        "'a' + 1",
+        "-'a'",
+        "True < False",
+        "1 == None",
+    ],
+)
+def test_unsupported_expressions(expression):
+    with pytest.raises(UnsupportedExpressionException):
+        evaluate_expr(expression)
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "'5' == 5",
+        "'2' > 1",
+        "True == 1",
+        "not None",
+        "0 or None",
+        "1 and None",
+    ],
+)
+def test_mixed_kinds_are_unsupported(expression):
+    with pytest.raises(UnsupportedExpressionException):
+        evaluate_expr(expression)
+
+
+def test_bool_operators_short_circuit():
+    # 1 / 0 would fail if evaluated
+    assert evaluate_expr("1 > 0 or 1 / 0 > 1") is True
+    assert evaluate_expr("1 < 0 and 1 / 0 > 1") is False
+    assert evaluate_expr("1.5 + 2 == 3.5 and 'a' + 'b' == 'ab'")
+
+
+def test_compile_expr_is_cached():
+    assert compile_expr("0 > 1") is compile_expr("0 > 1")
@@ -0,0 +1,17 @@
+from uuid import UUID
+
+from inorbit_edge_executor import ids
+from inorbit_edge_executor.ids import next_id
+
+
+def test_next_id_is_uuid4_hex():
+    mission_id = next_id()
+    assert len(mission_id) == 32
+    uuid = UUID(hex=mission_id)
+    assert uuid.version == 4
+    assert uuid.hex == mission_id
+
+
+def test_next_id_unique_across_blocks():
+    generated = {next_id() for _ in range(ids.IDS_PER_BLOCK * 2 + 1)}
+    assert len(generated) == ids.IDS_PER_BLOCK * 2 + 1
@@ -10,7 +10,8 @@ from inorbit_edge_executor.behavior_tree import (
     DummyNode,
 )
 from inorbit_edge_executor.inorbit import RobotApiFactory
-from inorbit_edge_executor.datatypes import Target
+from inorbit_edge_executor.datatypes import MissionDefinition, Target
+from inorbit_edge_executor.mission import Mission
 
 
 @pytest.mark.asyncio
@@ -391,3 +392,74 @@ def test_if_node_reset_execution(empty_context: BehaviorTreeBuilderContext):
     assert node.state == ""
     assert then_branch.nodes[0].state == ""
     assert else_branch.nodes[0].state == ""
+
+
+@pytest.mark.asyncio
+async def test_if_node_evaluates_constant_expressions_locally(
+    httpx_mock: HTTPXMock, robot_api_factory: RobotApiFactory
+):
+    """Test that IfNode does not call the expression API for constant expressions."""
+    robot = robot_api_factory.build("robot123")
+    context = BehaviorTreeBuilderContext(
+        robot_api=robot,
+        robot_api_factory=robot_api_factory,
+    )
+    then_branch = BehaviorTreeSequential(label="then")
+    then_branch.add_node(DummyNode(label="then_node"))
+    else_branch = BehaviorTreeSequential(label="else")
+    else_branch.add_node(DummyNode(label="else_node"))
+
+    node = IfNode(
+        context,
+        expression="1 + 1 > 1",
+        then_branch=then_branch,
+        else_branch=else_branch,
+        label="if node",
+    )
+
+    await node.execute()
+    assert node.state == NODE_STATE_SUCCESS
+    assert then_branch.nodes[0].already_executed()
+    assert not else_branch.nodes[0].already_executed()
+    assert not httpx_mock.get_requests()
+
+
+@pytest.mark.asyncio
+async def test_if_node_evaluates_expressions_with_names_remotely(
+    httpx_mock: HTTPXMock, robot_api_factory: RobotApiFactory
+):
+    """Test that IfNode does not resolve names from the mission arguments locally."""
+    robot = robot_api_factory.build("robot123")
+    context = BehaviorTreeBuilderContext(
+        robot_api=robot,
+        robot_api_factory=robot_api_factory,
+        mission=Mission(
+            id="mission123",
+            robot_id="robot123",
+            definition=MissionDefinition(steps=[]),
+            arguments={"speed": 2},
+        ),
+    )
+    httpx_mock.add_response(
+        method="POST",
+        url="http://unittest/expressions/robot/robot123/eval",
+        json={"success": True, "value": False},
+    )
+    then_branch = BehaviorTreeSequential(label="then")
+    then_branch.add_node(DummyNode(label="then_node"))
+    else_branch = BehaviorTreeSequential(label="else")
+    else_branch.add_node(DummyNode(label="else_node"))
+
+    node = IfNode(
+        context,
+        expression="speed > 1",
+        then_branch=then_branch,
+        else_branch=else_branch,
+        label="if node",
+    )
+
+    await node.execute()
+    assert node.state == NODE_STATE_SUCCESS
+    assert not then_branch.nodes[0].already_executed()
+    assert else_branch.nodes[0].already_executed()
+    assert len(httpx_mock.get_requests()) == 1
@@ -1,7 +1,13 @@
+import asyncio
+import json
+
 import pytest
 import httpx
 from pytest_httpx import HTTPXMock
-from inorbit_edge_executor.inorbit import InOrbitAPI
+from inorbit_edge_executor.datatypes import MissionDefinition
+from inorbit_edge_executor.exceptions import MissionCreationException
+from inorbit_edge_executor.inorbit import InOrbitAPI, MissionTrackingAPI
+from inorbit_edge_executor.mission import Mission
 
 
 def test_base_url_trailing_slash_stripped():
@@ -26,3 +32,175 @@ async def test_request_url_has_no_double_slash(httpx_mock: HTTPXMock):
 
     assert captured["url"] == "https://api.inorbit.ai/robots/door-rs-1/actions"
     assert "//robots" not in captured["url"]
+
+
+@pytest.mark.asyncio
+async def test_post_batched_without_batching_posts_directly(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(method="POST", url="http://unittest/missions", json={"id": "m1"})
+
+    api = InOrbitAPI(base_url="http://unittest", api_key="secret")
+    assert await api.post_batched("missions", {"missionId": "m1"}) == {"id": "m1"}
+
+
+@pytest.mark.asyncio
+async def test_post_batched_coalesces_requests_to_same_path(httpx_mock: HTTPXMock):
+    """Concurrent post_batched() calls to the same path are sent as one bulk request."""
+    bodies = []
+
+    def batch_callback(request: httpx.Request):
+        bodies.append(json.loads(request.content))
+        return httpx.Response(
+            status_code=200, json=[{"id": body["missionId"]} for body in bodies[-1]]
+        )
+
+    httpx_mock.add_callback(batch_callback, method="POST", url="http://unittest/missions/batch")
+
+    api = InOrbitAPI(base_url="http://unittest", api_key="secret", batch_window_ms=20)
+    await api.start_batching()
+    results = await asyncio.gather(
+        *(api.post_batched("missions", {"missionId": f"m{i}"}) for i in range(3))
+    )
+    await api.stop_batching()
+
+    assert results == [{"id": "m0"}, {"id": "m1"}, {"id": "m2"}]
+    assert bodies == [[{"missionId": "m0"}, {"missionId": "m1"}, {"missionId": "m2"}]]
+
+
+@pytest.mark.asyncio
+async def test_post_batched_propagates_errors_to_all_callers(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(method="POST", url="http://unittest/missions/batch", status_code=500)
+
+    api = InOrbitAPI(base_url="http://unittest", api_key="secret", batch_window_ms=20)
+    await api.start_batching()
+    results = await asyncio.gather(
+        *(api.post_batched("missions", {"missionId": f"m{i}"}) for i in range(2)),
+        return_exceptions=True,
+    )
+    await api.stop_batching()
+
+    assert all(isinstance(r, httpx.HTTPStatusError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_requests_share_one_client_until_closed(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(method="GET", url="http://unittest/missions/m1", is_reusable=True)
+
+    async with InOrbitAPI(base_url="http://unittest", api_key="secret") as api:
+        client = api._client
+        await api.get("missions/m1")
+        resp = await api.get("missions/m1")
+        assert api._client is client
+        assert resp.request.headers[InOrbitAPI.HTTP_API_KEY_HEADER] == "secret"
+    assert client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_request_body_is_sent_as_json(httpx_mock: HTTPXMock):
+    captured = {}
+
+    def capture(request: httpx.Request):
+        captured["content_type"] = request.headers["content-type"]
+        captured["body"] = json.loads(request.content)
+        return httpx.Response(status_code=200, json={"ok": True})
+
+    httpx_mock.add_callback(capture)
+
+    api = InOrbitAPI(base_url="http://unittest", api_key="secret")
+    await api.put("missions/m1", {"state": "in-progress", "data": {1: "one"}})
+
+    assert captured["content_type"] == "application/json"
+    assert captured["body"] == {"state": "in-progress", "data": {"1": "one"}}
+
+
+@pytest.mark.asyncio
+async def test_mission_tracking_creates_mission_when_marked_in_progress(httpx_mock: HTTPXMock):
+    captured = {}
+
+    def capture(request: httpx.Request):
+        captured["body"] = json.loads(request.content)
+        return httpx.Response(status_code=201, json={})
+
+    httpx_mock.add_callback(capture, method="POST", url="http://unittest/missions")
+    httpx_mock.add_response(method="PUT", url="http://unittest/missions/m1", json={})
+
+    mission = Mission(
+        id="m1",
+        robot_id="robot123",
+        definition=MissionDefinition(label="A mission", steps=[{"completeTask": "t1"}]),
+    )
+    mt = MissionTrackingAPI(mission, InOrbitAPI(base_url="http://unittest", api_key="secret"))
+    mt.set_create_on_start(True)
+
+    assert await mt.mark_in_progress()
+    assert captured["body"]["missionId"] == "m1"
+    assert captured["body"]["robotId"] == "robot123"
+    assert captured["body"]["state"] == "in-progress"
+    assert captured["body"]["tasks"] == [
+        {"taskId": "t1", "label": "t1", "inProgress": False, "completed": False}
+    ]
+    # Once created, the mission is updated
+    assert await mt.mark_in_progress()
+    assert mission.create_on_start is False
+
+
+@pytest.mark.asyncio
+async def test_mission_tracking_creates_mission_when_started(httpx_mock: HTTPXMock):
+    captured = {}
+
+    def capture(request: httpx.Request):
+        captured["body"] = json.loads(request.content)
+        return httpx.Response(status_code=201, json={})
+
+    httpx_mock.add_callback(capture, method="POST", url="http://unittest/missions")
+    httpx_mock.add_response(method="PUT", url="http://unittest/missions/m1", json={})
+
+    mission = Mission(
+        id="m1", robot_id="robot123", definition=MissionDefinition(steps=[]), create_on_start=True
+    )
+    mt = MissionTrackingAPI(mission, InOrbitAPI(base_url="http://unittest", api_key="secret"))
+
+    assert await mt.start()
+    assert captured["body"]["state"] == "starting"
+    assert captured["body"]["inProgress"] is False
+    # Already created: marking it in progress updates it
+    assert await mt.mark_in_progress()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("batch_window_ms", [None, 20])
+async def test_mission_tracking_create_with_empty_response(httpx_mock: HTTPXMock, batch_window_ms):
+    """A 201 reply with no content means the mission was created."""
+    httpx_mock.add_response(method="POST", url="http://unittest/missions", status_code=201)
+
+    mission = Mission(
+        id="m1", robot_id="robot123", definition=MissionDefinition(steps=[]), create_on_start=True
+    )
+    api = InOrbitAPI(base_url="http://unittest", api_key="secret", batch_window_ms=batch_window_ms)
+    await api.start_batching()
+    mt = MissionTrackingAPI(mission, api)
+    try:
+        assert await mt.start()
+    finally:
+        await api.stop_batching()
+    assert mission.create_on_start is False
+
+
+@pytest.mark.asyncio
+async def test_mission_tracking_create_failure_raises(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(method="POST", url="http://unittest/missions", status_code=500)
+
+    mission = Mission(id="m1", robot_id="robot123", definition=MissionDefinition(steps=[]))
+    mt = MissionTrackingAPI(mission, InOrbitAPI(base_url="http://unittest", api_key="secret"))
+    mt.set_create_on_start(True)
+
+    with pytest.raises(MissionCreationException):
+        await mt.mark_in_progress()
+    # Still pending, e.g. to retry after resuming the mission
+    assert mission.create_on_start is True
+
+
+def test_mission_create_on_start_is_persisted():
+    mission = Mission(id="m1", robot_id="robot123", definition=MissionDefinition(steps=[]))
+    MissionTrackingAPI(mission, api=None).set_create_on_start(True)
+    restored = Mission.model_validate(mission.model_dump(by_alias=True, exclude_none=True))
+    assert restored.create_on_start is True
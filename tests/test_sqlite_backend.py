@@ -0,0 +1,104 @@
+import asyncio
+import sqlite3
+
+import pytest
+import pytest_asyncio
+
+from inorbit_edge_executor.datatypes import MissionWorkerState
+from inorbit_edge_executor import sqlite_backend
+from inorbit_edge_executor.sqlite_backend import SqliteDB
+
+
+@pytest_asyncio.fixture
+async def db(tmp_path):
+    db = SqliteDB(str(tmp_path / "missions.db"))
+    await db.connect()
+    yield db
+    await db.shutdown()
+
+
+def _mission_state(mission_id, robot_id="robot123", finished=False, step=0):
+    return MissionWorkerState(
+        mission_id=mission_id,
+        robot_id=robot_id,
+        finished=finished,
+        state={"step": step},
+    )
+
+
+@pytest.mark.asyncio
+async def test_db_uses_wal_journal(db):
+    async with db.db.execute("PRAGMA journal_mode") as cursor:
+        assert (await cursor.fetchone())[0] == "wal"
+
+
+@pytest.mark.asyncio
+async def test_saved_mission_can_be_fetched(db):
+    await db.save_mission(_mission_state("m1"))
+
+    mission = await db.fetch_mission("m1")
+    assert mission.state == {"step": 0}
+    assert await db.fetch_robot_active_mission("robot123") == "m1"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_saves_keep_latest_state(db):
+    await asyncio.gather(
+        *(db.save_mission(_mission_state("m1", step=step)) for step in range(10)),
+        db.save_mission(_mission_state("m2", robot_id="robot456", finished=True)),
+    )
+
+    assert (await db.fetch_mission("m1")).state == {"step": 9}
+    assert len(await db.fetch_all_missions()) == 2
+    assert len(await db.fetch_all_missions(finished=False, paused=False)) == 1
+
+
+@pytest.mark.asyncio
+async def test_shutdown_writes_queued_states(tmp_path):
+    filename = str(tmp_path / "missions.db")
+    db = SqliteDB(filename)
+    await db.connect()
+    save = asyncio.create_task(db.save_mission(_mission_state("m1")))
+    await asyncio.sleep(0)
+    await db.shutdown()
+    await save
+
+    db = SqliteDB(filename)
+    await db.connect()
+    assert await db.fetch_mission("m1") is not None
+    await db.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_save_during_shutdown_does_not_hang(tmp_path):
+    db = SqliteDB(str(tmp_path / "missions.db"))
+    await db.connect()
+    save = asyncio.create_task(db.save_mission(_mission_state("m1")))
+    await asyncio.sleep(0)
+    shutdown = asyncio.create_task(db.shutdown())
+    await asyncio.sleep(0)
+    # Ignored: the DB is shutting down
+    await asyncio.wait_for(db.save_mission(_mission_state("m2", robot_id="robot456")), 1)
+    await asyncio.wait_for(asyncio.gather(save, shutdown), 1)
+
+
+@pytest.mark.asyncio
+async def test_failed_save_is_rolled_back(db, monkeypatch):
+    save_missions = sqlite_backend.queries.save_missions
+
+    async def fail_after_first_row(conn, rows):
+        await save_missions(conn, rows[:1])
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(sqlite_backend.queries, "save_missions", fail_after_first_row)
+    with pytest.raises(sqlite3.OperationalError):
+        await asyncio.gather(
+            db.save_mission(_mission_state("m1")),
+            db.save_mission(_mission_state("m2", robot_id="robot456")),
+        )
+    monkeypatch.setattr(sqlite_backend.queries, "save_missions", save_missions)
+    await db.save_mission(_mission_state("m3", robot_id="robot789"))
+
+    # m1 was written before the error, but must not be committed with the next batch
+    assert await db.fetch_mission("m1") is None
+    assert await db.fetch_mission("m3") is not None
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from inorbit_edge_executor.datatypes import MissionDefinition
+from inorbit_edge_executor.datatypes import MissionRuntimeOptions
+from inorbit_edge_executor.dummy_backend import DummyDB
+from inorbit_edge_executor.mission import Mission
+from inorbit_edge_executor.worker_pool import WorkerPool
+
+
+@pytest.mark.asyncio
+async def test_join_waits_for_missions(inorbit_api, httpx_mock):
+    # Mission tracking and robot lock requests
+    httpx_mock.add_response(json={}, is_reusable=True)
+    worker_pool = WorkerPool(api=inorbit_api, db=DummyDB())
+    await worker_pool.start()
+    missions = [
+        Mission(
+            id=f"mission{ix}",
+            robot_id=f"robot{ix}",
+            definition=MissionDefinition(steps=[{"timeoutSecs": 0.1}, {"data": {"key": ix}}]),
+        )
+        for ix in range(3)
+    ]
+    for mission in missions:
+        await worker_pool.submit_work(mission, MissionRuntimeOptions())
+    await asyncio.wait_for(worker_pool.join(), timeout=5)
+    for mission in missions:
+        status = await worker_pool.get_mission_status(mission.id)
+        assert status["finished"] is True
+    await worker_pool.shutdown()
+    await inorbit_api.aclose()
+
+
+@pytest.mark.asyncio
+async def test_join_without_missions(inorbit_api):
+    worker_pool = WorkerPool(api=inorbit_api, db=DummyDB())
+    await worker_pool.start()
+    await asyncio.wait_for(worker_pool.join(), timeout=1)
+    await worker_pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_submit_work_with_tasks(inorbit_api, httpx_mock):
+    httpx_mock.add_response(json={}, is_reusable=True)
+    worker_pool = WorkerPool(api=inorbit_api, db=DummyDB())
+    await worker_pool.start()
+    mission = Mission(
+        id="mission1",
+        robot_id="robot1",
+        definition=MissionDefinition(steps=[{"completeTask": "t1", "timeoutSecs": 0.1}]),
+    )
+    with pytest.raises(ValueError):
+        await worker_pool.submit_work(
+            mission, MissionRuntimeOptions(), tasks=[{"taskId": "other", "label": "Other"}]
+        )
+    await worker_pool.submit_work(
+        mission, MissionRuntimeOptions(), tasks=[{"taskId": "t1", "label": "Task 1"}]
+    )
+    # The given mission is not modified
+    assert mission.tasks_list[0].label == "t1"
+    assert mission.create_on_start is False
+    status = await worker_pool.get_mission_status(mission.id)
+    assert status["mission"]["tasks_list"][0]["label"] == "Task 1"
+    await asyncio.wait_for(worker_pool.join(), timeout=5)
+    # The mission was created in Mission Tracking when it started
+    assert httpx_mock.get_request(method="POST", url="http://unittest/missions")
+    await worker_pool.shutdown()
+    await inorbit_api.aclose()